@@ -3,9 +3,10 @@ from homeassistant.core import HomeAssistant
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_SCAN_INTERVAL
 
 # Importujeme seznam platforem a doménu
-from .const import DOMAIN, PLATFORMS, DEFAULT_SCAN_INTERVAL
+from .const import DOMAIN, PLATFORMS, DEFAULT_SCAN_INTERVAL, CONF_OFFLOAD, DEFAULT_OFFLOAD
 # Importujeme náš nový koordinátor
 from .coordinator import SolaxUpdateCoordinator
+from .battery import async_remove_battery_store
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Nastavení integrace z konfiguračního záznamu v UI."""
@@ -15,9 +16,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     ip = entry.data[CONF_HOST]
     pwd = entry.data[CONF_PASSWORD]
     scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    offload = entry.options.get(CONF_OFFLOAD, entry.data.get(CONF_OFFLOAD, DEFAULT_OFFLOAD))
 
     # Vytvoření instance koordinátora
-    coordinator = SolaxUpdateCoordinator(hass, ip, pwd, scan_interval)
+    coordinator = SolaxUpdateCoordinator(
+        hass, ip, pwd, scan_interval, entry.entry_id, offload=offload
+    )
+
+    # Obnovení uloženého stavu analytiky baterie (přežije restart)
+    await coordinator.battery.async_load()
 
     # --- ZMĚNA: Optimistický start ---
     # Zkusíme stáhnout data. Pokud střídač spí (neodpovídá), 
@@ -34,15 +41,33 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Načtení všech platforem (Senzory i Select)
     # Zde se využívá seznam PLATFORMS z const.py, který musí obsahovat ["sensor", "select"]
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Změna možností (offload) vyžaduje nové načtení integrace
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Znovunačtení po změně možností."""
+    # Změna intervalu ze select.py také aktualizuje záznam - tu řeší koordinátor sám
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    offload = entry.options.get(CONF_OFFLOAD, entry.data.get(CONF_OFFLOAD, DEFAULT_OFFLOAD))
+    if coordinator and coordinator.offload == offload:
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Odstranění integrace z Home Assistanta."""
     # Odstranění všech platforem
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if coordinator:
+            await coordinator.async_save_analytics()
     
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Smazání uložených dat analytiky baterie po odebrání integrace."""
+    await async_remove_battery_store(hass, entry.entry_id)
\ No newline at end of file
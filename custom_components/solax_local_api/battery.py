@@ -0,0 +1,214 @@
+"""Průběžná analytika baterie (coulomb counting, kapacita, cykly, zátěž)."""
+import logging
+import time
+from types import MappingProxyType
+
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    SENSOR_TYPES,
+    BATTERY_STORAGE_VERSION,
+    BATTERY_SAVE_DELAY,
+    BATTERY_MAX_GAP,
+    BATTERY_MIN_SOC_DELTA,
+    BATTERY_CAPACITY_SMOOTHING,
+    BATTERY_MIN_CAPACITY_SAMPLES,
+    BATTERY_REFERENCE_TEMPERATURE,
+    BATTERY_TEMPERATURE_RANGE,
+    DEFAULT_BATTERY_CAPACITY_KWH,
+    BATTERY_ANALYTICS_TYPES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Senzory, ze kterých analytika čte (musí být ve snímku k dispozici)
+BATTERY_REQUIRED_KEYS = frozenset({
+    "battery_current", "battery_power", "battery_soc", "battery_temperature",
+})
+
+
+def _battery_store(hass, entry_id):
+    """Úložiště stavu analytiky pro daný konfigurační záznam."""
+    return Store(hass, BATTERY_STORAGE_VERSION, f"{DOMAIN}.battery.{entry_id}")
+
+
+async def async_remove_battery_store(hass, entry_id):
+    """Smazání uloženého stavu analytiky při odebrání záznamu."""
+    await _battery_store(hass, entry_id).async_remove()
+
+
+def _signed(val):
+    """Převod 16bitové hodnoty na znaménkovou."""
+    return val - 65536 if val > 32767 else val
+
+
+class SolaxBatteryAnalytics:
+    """Inkrementální sledování stavu baterie z každého snímku dat.
+
+    Uchovává pouze několik skalárních hodnot (konstantní paměť), které
+    se ukládají přes Store, takže přežijí restart Home Assistanta.
+    """
+
+    def __init__(self, hass, entry_id):
+        self._store = _battery_store(hass, entry_id)
+        # Trvalé hodnoty (ukládají se)
+        self.charge_ah = 0.0
+        self.discharge_ah = 0.0
+        self.cycles = 0.0
+        self.stress_ah = 0.0
+        self.capacity_kwh = None
+        self.reference_capacity_kwh = None
+        self.reference_sum_kwh = 0.0
+        self.capacity_samples = 0
+
+        # Okno pro odhad kapacity (rozdíl SoC vs. integrovaná energie)
+        self._window_soc = None
+        self._window_kwh = 0.0
+
+        # Přechodný stav (neukládá se - po restartu začínáme nové měření)
+        self._last_time = None
+        self._last_soc = None
+
+        # Naplánované uložení a poslední kopie dat pro něj
+        self._save_pending = False
+        self._pending_data = None
+
+    @property
+    def usable_capacity_kwh(self):
+        """Odhadnutá kapacita, případně výchozí hodnota, dokud není k dispozici."""
+        return self.capacity_kwh or DEFAULT_BATTERY_CAPACITY_KWH
+
+    @property
+    def state_of_health(self):
+        """Stav baterie v % vůči referenční (počáteční) kapacitě."""
+        if not self.capacity_kwh or not self.reference_capacity_kwh:
+            return None
+        # Šum odhadu (kvantizace SoC) může referenci mírně překročit
+        return round(min(self.capacity_kwh / self.reference_capacity_kwh * 100, 100.0), 1)
+
+    def snapshot(self):
+        """Neměnná kopie hodnot pro entity (předává se v SolaxFrame)."""
+        values = {info[2]: getattr(self, info[2]) for info in BATTERY_ANALYTICS_TYPES.values()}
+        values["usable_capacity_kwh"] = self.usable_capacity_kwh
+        return MappingProxyType(values)
+
+    async def async_load(self):
+        """Načtení uloženého stavu."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self.charge_ah = stored.get("charge_ah", 0.0)
+        self.discharge_ah = stored.get("discharge_ah", 0.0)
+        self.cycles = stored.get("cycles", 0.0)
+        self.stress_ah = stored.get("stress_ah", 0.0)
+        self.capacity_kwh = stored.get("capacity_kwh")
+        self.reference_capacity_kwh = stored.get("reference_capacity_kwh")
+        self.reference_sum_kwh = stored.get("reference_sum_kwh", 0.0)
+        self.capacity_samples = stored.get("capacity_samples", 0)
+
+    async def async_save(self):
+        """Okamžité uložení (např. při odebrání integrace)."""
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self):
+        return {
+            "charge_ah": self.charge_ah,
+            "discharge_ah": self.discharge_ah,
+            "cycles": self.cycles,
+            "stress_ah": self.stress_ah,
+            "capacity_kwh": self.capacity_kwh,
+            "reference_capacity_kwh": self.reference_capacity_kwh,
+            "reference_sum_kwh": self.reference_sum_kwh,
+            "capacity_samples": self.capacity_samples,
+        }
+
+    def update(self, data, now=None):
+        """Zpracování jednoho snímku pole "Data" ze střídače."""
+        if now is None:
+            now = time.monotonic()
+
+        try:
+            current = _signed(data[SENSOR_TYPES["battery_current"][3]]) * SENSOR_TYPES["battery_current"][4]
+            power = _signed(data[SENSOR_TYPES["battery_power"][3]])
+            soc = data[SENSOR_TYPES["battery_soc"][3]]
+            temp = _signed(data[SENSOR_TYPES["battery_temperature"][3]])
+        except (IndexError, TypeError):
+            return
+
+        last_time, last_soc = self._last_time, self._last_soc
+        self._last_time, self._last_soc = now, soc
+
+        # První snímek nebo výpadek komunikace - jen nastavíme výchozí bod
+        if last_time is None or not 0 < now - last_time <= BATTERY_MAX_GAP:
+            self._window_soc = soc
+            self._window_kwh = 0.0
+            return
+
+        hours = (now - last_time) / 3600
+        amp_hours = current * hours
+        kwh = power * hours / 1000
+
+        # --- Coulomb counting (kladný proud = nabíjení) ---
+        if amp_hours > 0:
+            self.charge_ah += amp_hours
+        else:
+            self.discharge_ah -= amp_hours
+
+        # --- Teplotně vážená zátěž (zdvojnásobení na každých 10 °C odchylky) ---
+        temp = min(max(temp, BATTERY_TEMPERATURE_RANGE[0]), BATTERY_TEMPERATURE_RANGE[1])
+        factor = 2 ** (abs(temp - BATTERY_REFERENCE_TEMPERATURE) / 10)
+        self.stress_ah += abs(amp_hours) * factor
+
+        # --- Ekvivalentní plné cykly (součet změn SoC / 200 %) ---
+        self.cycles += abs(soc - last_soc) / 200
+
+        # --- Odhad kapacity ---
+        self._window_kwh += kwh
+        soc_delta = soc - self._window_soc
+        if soc_delta and (soc_delta > 0) != (self._window_kwh > 0):
+            # Změna směru toku energie - začínáme nové okno
+            self._window_soc = soc
+            self._window_kwh = 0.0
+        elif abs(soc_delta) >= BATTERY_MIN_SOC_DELTA:
+            self._add_capacity_sample(abs(self._window_kwh) / (abs(soc_delta) / 100))
+            self._window_soc = soc
+            self._window_kwh = 0.0
+
+    def async_schedule_save(self):
+        """Uložení stavu nejpozději po BATTERY_SAVE_DELAY (volat z event loopu)."""
+        # Ukládá se kopie pořízená na loopu, ne živý objekt měněný executorem
+        self._pending_data = self._data_to_save()
+        # async_delay_save při každém volání odkládá časovač - plánujeme
+        # jej proto jen jednou, jinak by se při dotazování nikdy neuložilo
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._pending_save_data, BATTERY_SAVE_DELAY)
+
+    def _pending_save_data(self):
+        """Data pro naplánované uložení (nejnovější kopie)."""
+        self._save_pending = False
+        return self._pending_data
+
+    def _add_capacity_sample(self, sample):
+        """Exponenciální vyhlazení odhadu kapacity."""
+        if self.capacity_kwh is None:
+            self.capacity_kwh = sample
+        else:
+            self.capacity_kwh += BATTERY_CAPACITY_SMOOTHING * (sample - self.capacity_kwh)
+        self.capacity_samples += 1
+
+        _LOGGER.debug(
+            "Nový vzorek kapacity baterie %.2f kWh, odhad %.2f kWh",
+            sample, self.capacity_kwh,
+        )
+
+        # Referenční kapacita je průměr prvních vzorků - jednotlivé odchylky
+        # (kvantizace SoC po 1 %) ji tak trvale neposunou
+        if self.reference_capacity_kwh is not None:
+            return
+        self.reference_sum_kwh += sample
+        if self.capacity_samples >= BATTERY_MIN_CAPACITY_SAMPLES:
+            self.reference_capacity_kwh = self.reference_sum_kwh / self.capacity_samples
+
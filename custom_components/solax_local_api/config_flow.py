@@ -5,13 +5,14 @@ import async_timeout
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 # PŮVODNĚ: from homeassistant.components import dhcp
 # NOVĚ: Importujeme ze správného umístění pro HA 2026.2+
 from homeassistant.helpers.service_info.dhcp import DhcpServiceInfo 
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_SCAN_INTERVAL
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+from .const import DOMAIN, DEFAULT_SCAN_INTERVAL, CONF_OFFLOAD, DEFAULT_OFFLOAD
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_HOST): str,
     vol.Required(CONF_PASSWORD): str,
     vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+    vol.Optional(CONF_OFFLOAD, default=DEFAULT_OFFLOAD): bool,
 })
 
 class SolaxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -29,6 +31,12 @@ class SolaxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self):
         self._discovered_host = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Možnosti lze měnit bez odebrání integrace."""
+        return SolaxOptionsFlow()
+
     async def _verify_pocket_wifi(self, ip_address):
         """Ověří zařízení kontrolou stránky /login."""
         session = async_get_clientsession(self.hass)
@@ -89,4 +97,24 @@ class SolaxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 user_input or {CONF_HOST: self._discovered_host or ""}
             ),
             errors=errors,
+        )
+
+
+class SolaxOptionsFlow(config_entries.OptionsFlow):
+    """Možnosti existujícího záznamu SolaX."""
+
+    async def async_step_init(self, user_input=None):
+        """Přepnutí zpracování dat mimo event loop."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        # Výchozí hodnota z možností, případně z původního nastavení
+        current = self.config_entry.options.get(
+            CONF_OFFLOAD, self.config_entry.data.get(CONF_OFFLOAD, DEFAULT_OFFLOAD)
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_OFFLOAD, default=current): bool,
+            }),
         )
\ No newline at end of file
@@ -8,6 +8,21 @@ PLATFORMS = ["sensor", "select"]
 # Výchozí interval obnovy dat (sekundy)
 DEFAULT_SCAN_INTERVAL = 10
 
+# Zpracování snímku (parsování, dekódování, analytika) v executoru mimo event loop
+CONF_OFFLOAD = "offload_processing"
+DEFAULT_OFFLOAD = False
+
+# Analytika baterie
+BATTERY_STORAGE_VERSION = 1
+BATTERY_SAVE_DELAY = 300          # Zpožděné ukládání stavu do Store (s)
+BATTERY_MAX_GAP = 600             # Delší mezera mezi snímky se neintegruje (s)
+BATTERY_MIN_SOC_DELTA = 10        # Minimální změna SoC pro vzorek kapacity (%)
+BATTERY_CAPACITY_SMOOTHING = 0.2  # Váha nového vzorku kapacity (EMA)
+BATTERY_MIN_CAPACITY_SAMPLES = 5  # Počet prvních vzorků, z jejichž průměru je referenční kapacita
+BATTERY_REFERENCE_TEMPERATURE = 25
+BATTERY_TEMPERATURE_RANGE = (-40, 80)  # Rozsah teplot pro výpočet zátěže (°C)
+DEFAULT_BATTERY_CAPACITY_KWH = 11.5
+
 # Mapování režimů pro textové senzory
 SOLAX_MODES = {
     0: "Self Use Mode", 
@@ -100,4 +115,15 @@ SENSOR_TYPES = {
     # --- Teploty ---
     "inverter_temperature_inner": ["Inverter Temperature inner", "°C", "temperature", 46, 1, 0],
     "inverter_temperature": ["Inverter Temperature", "°C", "temperature", 54, 1, 0],
-}
\ No newline at end of file
+}
+
+# Vypočtené senzory analytiky baterie
+# Formát: "id": ["Název", "Jednotka", "Atribut SolaxBatteryAnalytics", "Přesnost"]
+BATTERY_ANALYTICS_TYPES = {
+    "battery_capacity_estimate": ["Battery Estimated Capacity", "kWh", "capacity_kwh", 2],
+    "battery_health": ["Battery State of Health", "%", "state_of_health", 1],
+    "battery_cycles": ["Battery Cycles", None, "cycles", 2],
+    "battery_charge_ah": ["Battery Charge Throughput", "Ah", "charge_ah", 1],
+    "battery_discharge_ah": ["Battery Discharge Throughput", "Ah", "discharge_ah", 1],
+    "battery_stress": ["Battery Thermal Stress", "Ah", "stress_ah", 1],
+}
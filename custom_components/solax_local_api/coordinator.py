@@ -1,5 +1,10 @@
+import asyncio
+import json
 import logging
+import time
+from dataclasses import dataclass
 from datetime import timedelta
+from types import MappingProxyType
 import async_timeout
 
 from homeassistant.helpers.update_coordinator import (
@@ -8,12 +13,72 @@ from homeassistant.helpers.update_coordinator import (
 )
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from .battery import SolaxBatteryAnalytics, BATTERY_REQUIRED_KEYS
+from .const import SENSOR_TYPES, SOLAX_MODES, SOLAX_STATES, SOLAX_INVERTER_TYPES
+
 _LOGGER = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class SolaxFrame:
+    """Neměnný výsledek jednoho dotazu předávaný entitám."""
+
+    version: str | None
+    registers: tuple
+    information: tuple
+    values: MappingProxyType
+    available_keys: frozenset
+    battery: MappingProxyType
+
+
+def _decode_value(key, info, registers, information, version):
+    """Dekódování hodnoty jednoho senzoru ze syrových registrů."""
+    idx, factor, dtype = info[3], info[4], info[5]
+
+    val = None
+    if dtype == 8: return version
+
+    if dtype == 0: val = registers[idx]
+    elif dtype == 1:
+        val = registers[idx]
+        if val > 32767: val -= 65536
+    elif dtype == 2: val = (registers[idx[0]] * 65536) + registers[idx[1]]
+    elif dtype == 3:
+        raw = registers[idx]
+        return SOLAX_MODES.get(raw, f"Neznámý ({raw})") if key == "mode" else SOLAX_STATES.get(raw, f"Neznámý ({raw})")
+    elif dtype == 4: val = registers[idx[0]] + registers[idx[1]]
+    elif dtype == 5: return "OK" if registers[idx] == 1 else "Chyba"
+    elif dtype == 7: return information[idx]
+    elif dtype == 9:
+        raw = information[idx]
+        return SOLAX_INVERTER_TYPES.get(raw, f"Model {raw}")
+
+    return round(val * factor, 2) if val is not None else None
+
+
+def _frame_layout(data):
+    """Určení senzorů, jejichž registry jsou v daném snímku k dispozici."""
+    data_len = len(data.get("Data") or [])
+    info_len = len(data.get("Information") or [])
+
+    available = set()
+    for key, info in SENSOR_TYPES.items():
+        idx, dtype = info[3], info[5]
+        if dtype == 8:
+            present = data.get("ver") is not None
+        else:
+            indexes = idx if isinstance(idx, tuple) else (idx,)
+            length = info_len if dtype in (7, 9) else data_len
+            present = max(indexes) < length
+        if present:
+            available.add(key)
+    return frozenset(available)
+
+
 class SolaxUpdateCoordinator(DataUpdateCoordinator):
     """Třída pro stahování dat ze střídače přes lokální API."""
 
-    def __init__(self, hass, ip, pwd, scan_interval):
+    def __init__(self, hass, ip, pwd, scan_interval, entry_id, offload=False):
         super().__init__(
             hass, _LOGGER, name="Solax Data",
             update_interval=timedelta(seconds=scan_interval),
@@ -21,6 +86,20 @@ class SolaxUpdateCoordinator(DataUpdateCoordinator):
         self.ip = ip
         self.pwd = pwd
         self.session = async_get_clientsession(hass)
+        # Analytika baterie krmená každým snímkem
+        self.battery = SolaxBatteryAnalytics(hass, entry_id)
+        # Senzory dostupné v aktuálním formátu snímku (firmware, délka polí)
+        self._available_keys = frozenset()
+        self._frame_signature = None
+        # Formáty snímku, o kterých už bylo zalogováno (logujeme jen poprvé)
+        self._seen_signatures = set()
+        # Stavové zpracování (mapa registrů, analytika) nesmí běžet souběžně
+        self._process_lock = asyncio.Lock()
+        # Zpracování snímku mimo event loop (v executoru)
+        self.offload = offload
+        # Měření: doba zpracování snímku a zpoždění event loopu během něj (ms)
+        self.processing_time_ms = None
+        self.loop_lag_ms = None
 
     async def _async_update_data(self):
         """Načtení dat z API."""
@@ -33,9 +112,115 @@ class SolaxUpdateCoordinator(DataUpdateCoordinator):
                     if response.status != 200:
                         raise UpdateFailed(f"Chyba střídače: {response.status}")
                     
-                    data = await response.json(content_type=None)
-                    if not data or "Data" not in data:
-                        raise UpdateFailed("Neúplná data ze střídače")
-                    return data
+                    body = await response.read()
+
+            # Parsování, dekódování a analytika - volitelně v executoru
+            async with self._process_lock:
+                self._schedule_lag_probe()
+                if self.offload:
+                    frame, processing = await self.hass.async_add_executor_job(
+                        self._process_frame, body
+                    )
+                else:
+                    frame, processing = self._process_frame(body)
+
+                # Plánování uložení musí proběhnout na event loopu
+                self.battery.async_schedule_save()
         except Exception as err:
-            raise UpdateFailed(f"Chyba komunikace: {err}")
\ No newline at end of file
+            raise UpdateFailed(f"Chyba komunikace: {err}")
+
+        self.processing_time_ms = round(processing * 1000, 2)
+        return frame
+
+    def _schedule_lag_probe(self):
+        """Změření zpoždění callbacku naplánovaného na začátku zpracování.
+
+        Při zpracování na loopu callback čeká, dokud zpracování neskončí;
+        při offloadu se spustí hned, jak je loop volný.
+        """
+        scheduled = time.perf_counter()
+
+        def _probe():
+            self.loop_lag_ms = round((time.perf_counter() - scheduled) * 1000, 2)
+
+        self.hass.loop.call_soon(_probe)
+
+    async def async_save_analytics(self):
+        """Okamžité uložení analytiky baterie mimo běžící zpracování."""
+        async with self._process_lock:
+            await self.battery.async_save()
+
+    def _process_frame(self, body):
+        """Synchronní zpracování odpovědi (lze spustit v executoru)."""
+        start = time.perf_counter()
+
+        data = json.loads(body)
+        if not data or "Data" not in data:
+            raise UpdateFailed("Neúplná data ze střídače")
+
+        self._validate_frame(data)
+        available_keys = self._available_keys
+        registers = tuple(data.get("Data") or ())
+        information = tuple(data.get("Information") or ())
+        version = data.get("ver")
+
+        values = {}
+        for key, info in SENSOR_TYPES.items():
+            if key not in available_keys:
+                continue
+            try:
+                values[key] = _decode_value(key, info, registers, information, version)
+            except (TypeError, KeyError):
+                values[key] = None
+
+        # Chyba analytiky nesmí shodit hlavní datový tok
+        if BATTERY_REQUIRED_KEYS <= available_keys:
+            try:
+                self.battery.update(registers)
+            except Exception:
+                _LOGGER.exception("Chyba analytiky baterie, snímek se zpracuje bez ní")
+
+        frame = SolaxFrame(
+            version=version,
+            registers=registers,
+            information=information,
+            values=MappingProxyType(values),
+            available_keys=available_keys,
+            battery=self.battery.snapshot(),
+        )
+        return frame, time.perf_counter() - start
+
+    def _validate_frame(self, data):
+        """Jednorázová kontrola délky snímku vůči tabulce registrů.
+
+        Mapa dostupných senzorů se přepočítá jen při změně firmwaru nebo
+        délky polí, takže jednotlivé entity nemusí při každém dotazu
+        zachytávat IndexError.
+        """
+        signature = (
+            data.get("ver"),
+            len(data.get("Data") or []),
+            len(data.get("Information") or []),
+        )
+        if signature == self._frame_signature:
+            return
+
+        # Dongle může střídat délky snímku - opakované změny jen do debugu
+        first_seen = signature not in self._seen_signatures
+        self._seen_signatures.add(signature)
+        if self._frame_signature is not None:
+            _LOGGER.log(
+                logging.INFO if first_seen else logging.DEBUG,
+                "Změna formátu snímku ze střídače: firmware %s, %d registrů (dříve %s, %d)",
+                signature[0], signature[1],
+                self._frame_signature[0], self._frame_signature[1],
+            )
+        self._frame_signature = signature
+        self._available_keys = _frame_layout(data)
+
+        missing = sorted(SENSOR_TYPES.keys() - self._available_keys)
+        if missing and first_seen:
+            _LOGGER.warning(
+                "Snímek ze střídače (firmware %s, %d registrů) neobsahuje data pro: %s",
+                signature[0], signature[1], ", ".join(missing),
+            )
\ No newline at end of file
@@ -9,7 +9,10 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.const import EntityCategory
 
 # Importování mapovacích tabulek z const.py
-from .const import DOMAIN, SENSOR_TYPES, SOLAX_MODES, SOLAX_STATES, SOLAX_INVERTER_TYPES
+from .const import (
+    DOMAIN, SENSOR_TYPES, SOLAX_INVERTER_TYPES,
+    BATTERY_ANALYTICS_TYPES, DEFAULT_BATTERY_CAPACITY_KWH,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +27,13 @@ async def async_setup_entry(hass, entry, async_add_entities):
     
     # 2. Diagnostický senzor intervalu
     entities.append(SolaxIntervalDiagnostic(coordinator, entry))
+    entities.append(SolaxProcessingDiagnostic(coordinator, entry))
+
+    # 3. Vypočtené senzory analytiky baterie
+    entities.extend(
+        SolaxBatteryAnalyticsSensor(coordinator, key, info, entry)
+        for key, info in BATTERY_ANALYTICS_TYPES.items()
+    )
 
     async_add_entities(entities)
 
@@ -60,6 +70,88 @@ class SolaxIntervalDiagnostic(CoordinatorEntity, SensorEntity):
         return None
 
 
+class SolaxProcessingDiagnostic(CoordinatorEntity, SensorEntity):
+    """Diagnostický senzor doby zpracování snímku a zpoždění event loopu."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Doba zpracování dat"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = "ms"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:timer-sand"
+
+    def __init__(self, coordinator, entry):
+        super().__init__(coordinator)
+        self._entry = entry
+        self._attr_unique_id = f"solax_processing_diagnostic_{entry.entry_id}"
+        self.entity_id = f"sensor.solax_processing_diagnostic"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._entry.entry_id)}
+        )
+
+    @property
+    def native_value(self):
+        """Doba parsování, dekódování a analytiky posledního snímku."""
+        return self.coordinator.processing_time_ms
+
+    @property
+    def extra_state_attributes(self):
+        """Srovnání zátěže event loopu s vypnutým a zapnutým offloadem."""
+        return {
+            "offload": self.coordinator.offload,
+            "event_loop_lag_ms": self.coordinator.loop_lag_ms,
+        }
+
+
+class SolaxBatteryAnalyticsSensor(CoordinatorEntity, SensorEntity):
+    """Senzor vypočtený průběžnou analytikou baterie (bez dotazů do historie)."""
+
+    def __init__(self, coordinator, sensor_key, info, entry):
+        super().__init__(coordinator)
+        self._key = sensor_key
+        self._info = info
+        self._entry = entry
+
+        self.entity_id = f"sensor.solax_{sensor_key}"
+        self._attr_name = info[0]
+        self._attr_unique_id = f"solax_{sensor_key}_{entry.entry_id}"
+        self._attr_native_unit_of_measurement = info[1]
+
+        # Odhady kolísají, čítače pouze rostou
+        if sensor_key in ("battery_capacity_estimate", "battery_health"):
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        else:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+        icons = {
+            "battery_capacity_estimate": "mdi:battery-high",
+            "battery_health": "mdi:battery-heart-variant",
+            "battery_cycles": "mdi:battery-sync",
+            "battery_charge_ah": "mdi:battery-arrow-up-outline",
+            "battery_discharge_ah": "mdi:battery-arrow-down",
+            "battery_stress": "mdi:thermometer-alert",
+        }
+        self._attr_icon = icons.get(sensor_key, "mdi:battery")
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._entry.entry_id)}
+        )
+
+    @property
+    def native_value(self):
+        """Aktuální hodnota z analytiky baterie."""
+        if not self.coordinator.data:
+            return None
+        val = self.coordinator.data.battery.get(self._info[2])
+        return round(val, self._info[3]) if val is not None else None
+
+
 class SolaxSensor(CoordinatorEntity, SensorEntity):
     """Reprezentace senzoru SolaX."""
 
@@ -116,8 +208,8 @@ class SolaxSensor(CoordinatorEntity, SensorEntity):
         sn_value = None
 
         if self.coordinator.data:
-            fw_version = self.coordinator.data.get("ver", "Neznámý")
-            info_field = self.coordinator.data.get("Information", [])
+            fw_version = self.coordinator.data.version or "Neznámý"
+            info_field = self.coordinator.data.information
             if len(info_field) > 2:
                 sn_value = info_field[2]
                 raw_model_code = info_field[1]
@@ -133,39 +225,22 @@ class SolaxSensor(CoordinatorEntity, SensorEntity):
             configuration_url=f"http://{self.coordinator.ip}",
         )
 
+    @property
+    def available(self) -> bool:
+        """Senzor mimo rozsah aktuálního snímku je nedostupný."""
+        return (
+            super().available
+            and self.coordinator.data is not None
+            and self._key in self.coordinator.data.available_keys
+        )
+
     @property
     def native_value(self):
-        """Zpracování hodnoty ze syrových dat."""
+        """Hodnota dekódovaná koordinátorem (jednou za dotaz)."""
         if not self.coordinator.data:
             return None
-            
-        res = self.coordinator.data
-        idx, factor, dtype = self._info[3], self._info[4], self._info[5]
-        data = res.get("Data", [])
-        info_field = res.get("Information", [])
-
-        try:
-            val = None
-            if dtype == 8: return res.get("ver")
-            
-            if dtype == 0: val = data[idx]
-            elif dtype == 1:
-                val = data[idx]
-                if val > 32767: val -= 65536
-            elif dtype == 2: val = (data[idx[0]] * 65536) + data[idx[1]]
-            elif dtype == 3:
-                raw = data[idx]
-                return SOLAX_MODES.get(raw, f"Neznámý ({raw})") if self._key == "mode" else SOLAX_STATES.get(raw, f"Neznámý ({raw})")
-            elif dtype == 4: val = data[idx[0]] + data[idx[1]]
-            elif dtype == 5: return "OK" if data[idx] == 1 else "Chyba"
-            elif dtype == 7: return info_field[idx]
-            elif dtype == 9:
-                raw = info_field[idx]
-                return SOLAX_INVERTER_TYPES.get(raw, f"Model {raw}")
-                
-            return round(val * factor, 2) if val is not None else None
-        except (IndexError, TypeError, KeyError):
-            return None
+
+        return self.coordinator.data.values.get(self._key)
 
     @property
     def icon(self):
@@ -197,7 +272,7 @@ class SolaxSensor(CoordinatorEntity, SensorEntity):
                 state_def = SENSOR_TYPES.get("state") 
                 if state_def and self.coordinator.data:
                     state_idx = state_def[3] 
-                    data_list = self.coordinator.data.get("Data", [])
+                    data_list = self.coordinator.data.registers
                     if len(data_list) > state_idx:
                         raw_state_val = data_list[state_idx]
                         if raw_state_val in [0, 1, 3, 9, 10]:
@@ -216,10 +291,13 @@ class SolaxSensor(CoordinatorEntity, SensorEntity):
 
         # --- 3. BATERIE - Ostatní ---
         if "remain" in key or "remain" in name:
-            BATTERY_CAPACITY_KWH = 11.5 
+            # Odhad kapacity z analytiky baterie (výchozí 11.5 kWh, dokud není naměřen)
+            capacity_kwh = DEFAULT_BATTERY_CAPACITY_KWH
+            if self.coordinator.data:
+                capacity_kwh = self.coordinator.data.battery["usable_capacity_kwh"]
             if val is None: return "mdi:battery-unknown"
             try:
-                if float(val) > (BATTERY_CAPACITY_KWH / 2):
+                if float(val) > (capacity_kwh / 2):
                     return "mdi:battery-check"
                 else:
                     return "mdi:battery-check-outline"
@@ -266,7 +344,7 @@ class SolaxSensor(CoordinatorEntity, SensorEntity):
                     state_def = SENSOR_TYPES.get("state")
                     if state_def and self.coordinator.data:
                         state_idx = state_def[3]
-                        data_list = self.coordinator.data.get("Data", [])
+                        data_list = self.coordinator.data.registers
                         if len(data_list) > state_idx:
                             raw_state_val = data_list[state_idx]
                             if raw_state_val in [0, 1, 3, 9, 10]:
@@ -0,0 +1,124 @@
+"""Srovnání zpoždění event loopu se zapnutým a vypnutým offloadem.
+
+Spustí falešné Pocket Wi-Fi dongly (lokální HTTP servery vracející
+syntetický snímek) a nad nimi několik koordinátorů SolaX. Během dotazování
+měří zpoždění pravidelně plánovaného callbacku (drift), a to pro zpracování
+na event loopu i v executoru.
+
+Vyžaduje nainstalovaný balík homeassistant:
+
+    python scripts/benchmark_event_loop.py --entries 5 --polls 200
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.solax_local_api.coordinator import SolaxUpdateCoordinator  # noqa: E402
+
+PROBE_INTERVAL = 0.001
+
+
+def _fake_frame(registers):
+    """Syntetická odpověď ReadRealTimeData."""
+    return json.dumps({
+        "sn": "SXFAKE0000",
+        "ver": "3.009.10",
+        "type": 14,
+        "Data": [random.randint(0, 65535) for _ in range(registers)],
+        "Information": [10.0, 14, "H34A10FAKE0000", 8, 1.27, 0.0, 1.23, 0.0, 0.0, 1],
+    }).encode()
+
+
+async def _start_fake_dongle(body):
+    """Minimální HTTP server odpovídající na každý POST stejným snímkem."""
+
+    async def handle(reader, writer):
+        try:
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"127.0.0.1:{port}"
+
+
+async def _run(hass, hosts, offload, polls):
+    """Dotazování všech koordinátorů a měření driftu callbacku."""
+    coordinators = [
+        SolaxUpdateCoordinator(hass, host, "fake", 10, f"bench_{offload}_{i}", offload=offload)
+        for i, host in enumerate(hosts)
+    ]
+    lags = []
+    running = True
+
+    async def probe():
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    coordinator_lags = []
+    for _ in range(polls):
+        await asyncio.gather(*(c._async_update_data() for c in coordinators))
+        coordinator_lags.extend(c.loop_lag_ms for c in coordinators if c.loop_lag_ms is not None)
+    running = False
+    await probe_task
+
+    lags.sort()
+    return {
+        "offload": offload,
+        "probe_max_ms": round(lags[-1], 3),
+        "probe_p99_ms": round(lags[int(len(lags) * 0.99)], 3),
+        "coordinator_lag_mean_ms": round(statistics.mean(coordinator_lags), 3),
+        "processing_ms": coordinators[0].processing_time_ms,
+    }
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        servers = []
+        hosts = []
+        for _ in range(args.entries):
+            server, host = await _start_fake_dongle(_fake_frame(args.registers))
+            servers.append(server)
+            hosts.append(host)
+
+        try:
+            for offload in (False, True):
+                print(await _run(hass, hosts, offload, args.polls))
+        finally:
+            for server in servers:
+                server.close()
+            await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5, help="Počet falešných střídačů")
+    parser.add_argument("--polls", type=int, default=200, help="Počet dotazů na každý střídač")
+    parser.add_argument("--registers", type=int, default=300, help="Délka pole Data")
+    asyncio.run(main(parser.parse_args()))